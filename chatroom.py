@@ -34,6 +34,7 @@ def handle(client):
 def receive():  # accepting multiple clients
     while True:
         client, address = server.accept()
+        client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # relay short chat lines immediately
         print("Connected with {}".format(str(address)))
         client.send('NICKNAME'.encode('ascii'))
         nickname = client.recv(1024).decode('ascii')
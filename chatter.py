@@ -1,40 +1,90 @@
-import socket, threading, sys
+import socket, selectors, threading, sys, os
 
 nickname = input("Choose your nickname: ")
 ip = input("Input ip address: ") or "127.0.0.1"
 
 client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)  # socket initialization
 client.connect((ip, 8888))  # connecting client to server
+client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # send short lines immediately
+client.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+client.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+if hasattr(socket, "TCP_QUICKACK"):  # Linux only
+    client.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
 
+quit_event = threading.Event()
 
-def receive():
-    while True:  # making valid connection
-        try:
-            message = client.recv(1024).decode('ascii')
-            if message == 'NICKNAME':
-                client.send(nickname.encode('ascii'))
-            else:
-                print(message)
-        except:  # case on wrong ip/port details
-            print("An error occurred!")
-            client.close()
-            break
+
+def receive():  # returns False once the connection is gone
+    try:
+        chunk = client.recv(65536)
+    except OSError:  # case on wrong ip/port details
+        chunk = b''
+    if not chunk:
+        print("An error occurred!")
+        return False
+    if chunk == b'NICKNAME':
+        client.send(nickname.encode('ascii'))
+    else:
+        print(chunk.decode('ascii', 'replace'))
+    return True
+
+
+def send(user_input):  # returns False when the user quits
+    if user_input.lower() == 'quit':
+        return False
+
+    print("\033[F\033[K", end="")
+
+    message = f"{nickname}: {user_input}"
+    client.send(message.encode('ascii', 'replace'))  # the room is ASCII; don't die on "café"
+    return True
 
 
-def write():
-    while True:
-        user_input = input('')
-        if user_input.lower() == 'quit':
-            sys.exit()
-        
-        print("\033[F\033[K", end="")
+stdin_buf = bytearray()
 
-        message = f"{nickname}: {user_input}"
-        client.send(message.encode('ascii'))
 
+def read_stdin():  # raw fd reads, so a pasted block is sent at once
+    chunk = os.read(sys.stdin.fileno(), 4096)
+    if not chunk:  # stdin closed, but still send an unterminated last line
+        if stdin_buf:
+            send(stdin_buf.decode('utf-8', 'replace'))
+        return False
+    stdin_buf.extend(chunk)
+    *lines, rest = stdin_buf.split(b'\n')
+    stdin_buf[:] = rest
+    for line in lines:
+        if not send(line.decode('utf-8', 'replace').rstrip('\r')):
+            return False
+    return True
 
 
-receive_thread = threading.Thread(target=receive)  # receiving multiple messages
-receive_thread.start()
-write_thread = threading.Thread(target=write)  # sending messages
-write_thread.start()
\ No newline at end of file
+def write():  # input() loop for when stdin isn't a selectable terminal
+    try:
+        while send(input('')):
+            pass
+    except EOFError:  # stdin closed
+        pass
+    quit_event.set()
+
+
+sel = selectors.DefaultSelector()
+sel.register(client, selectors.EVENT_READ, receive)
+# Windows only selects on sockets, and redirected stdin may already sit in
+# sys.stdin's buffer after the prompts above, so only a POSIX terminal is
+# read on the selector; anything else keeps input() on its own thread
+if os.name == 'posix' and sys.stdin.isatty():
+    sel.register(sys.stdin, selectors.EVENT_READ, read_stdin)  # whole client runs on one thread
+    poll_timeout = None
+else:
+    threading.Thread(target=write, daemon=True).start()
+    poll_timeout = 0.5  # wake up to notice quit_event
+
+running = True
+while running and not quit_event.is_set():
+    for key, _ in sel.select(timeout=poll_timeout):
+        if not key.data():
+            running = False
+            break
+
+sel.close()
+client.close()
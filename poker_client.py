@@ -1,34 +1,124 @@
 import socket
 import json
+import queue
+import threading
+from functools import lru_cache
 
-def send_line(conn, msg: str):
-    if not msg.endswith("\n"):
-        msg += "\n"
-    conn.sendall(msg.encode("utf-8"))
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
 
-def recv_line(conn) -> str:
-    data = b""
-    while True:
-        chunk = conn.recv(1)
-        if not chunk:
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class LineReader:
+    # Reads into one preallocated buffer with recv_into; [r:w] is the unread data
+    def __init__(self, conn, size=65536):
+        self.conn = conn
+        self.buf = bytearray(size)
+        self.r = self.w = 0
+
+    def fill(self):
+        if self.w == len(self.buf):
+            if self.r:
+                # Move the partial line to the front to make room
+                self.buf[:self.w - self.r] = self.buf[self.r:self.w]
+                self.w -= self.r
+                self.r = 0
+            else:
+                # A single line larger than the buffer
+                self.buf.extend(bytes(len(self.buf)))
+        n = self.conn.recv_into(memoryview(self.buf)[self.w:])
+        if not n:
             raise ConnectionError("Connection closed by server.")
-        if chunk == b"\n":
-            break
-        data += chunk
-    return data.decode("utf-8").strip()
+        self.w += n
+
+    def readline(self) -> bytes:
+        idx = self.buf.find(b"\n", self.r, self.w)
+        while idx == -1:
+            scanned = self.w - self.r
+            self.fill()
+            idx = self.buf.find(b"\n", self.r + scanned, self.w)
+        # Copy out: the line is handed to another thread while the buffer is reused
+        line = bytes(memoryview(self.buf)[self.r:idx])
+        self.r = idx + 1
+        if self.r == self.w:
+            self.r = self.w = 0
+        return line
+
+def drain_lines(conn, lines):
+    # Runs on its own thread so the socket keeps draining while the main
+    # thread decodes frames or sits in input()
+    reader = LineReader(conn)
+    try:
+        while True:
+            lines.put(reader.readline())
+    except ConnectionError as e:
+        lines.put(e)
+    except OSError as e:
+        lines.put(ConnectionError(e))
+
+def next_line(lines) -> bytes:
+    line = lines.get()
+    if isinstance(line, ConnectionError):
+        raise line
+    return line
+
+PAYLOAD_KEY = b'"payload":'
+
+def payload_literal(line: bytes) -> bytes:
+    # The relay writes "payload" as the last key, so its raw JSON string runs
+    # from after the key up to the closing brace and can be inspected in place
+    start = line.find(PAYLOAD_KEY)
+    if start == -1:
+        return b""
+    return line[start + len(PAYLOAD_KEY):line.rfind(b"}")].strip()
+
+def decode_payload(line: bytes, literal: bytes) -> str:
+    if literal.startswith(b'"'):
+        try:
+            payload = json_loads(literal)
+        except json.JSONDecodeError:
+            pass  # payload was not the last key; fall back to the full frame
+        else:
+            if isinstance(payload, str):
+                return payload
+    return json_loads(line).get("payload", "")
+
+@lru_cache(maxsize=8)
+def envelope_prefix(to_id) -> bytes:
+    # to_id is fixed after the handshake, so the '{"to":...,"payload":' head is built once
+    return b'{"to":' + json_dumps(to_id) + b',"payload":'
+
+@lru_cache(maxsize=64)
+def encode_payload(payload: str) -> bytes:
+    # repeated control frames ("LIST", "ACTION:call", ...) are only serialized once
+    return json_dumps(payload)
 
 def relay_send(conn, to_id, payload: str):
-    msg = {"to": to_id, "payload": payload}
-    send_line(conn, json.dumps(msg))
+    conn.sendall(envelope_prefix(to_id) + encode_payload(payload) + b"}\n")
+
+def tune_socket(conn):
+    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    conn.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+    conn.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+    if hasattr(socket, "TCP_QUICKACK"):  # Linux only
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
 
 def run_client(host="127.0.0.1", port=9000):
     print(f"Connecting to relay {host}:{port} ...")
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         s.connect((host, port))
+        tune_socket(s)
         print("Connected to relay.")
+        lines = queue.SimpleQueue()
+        threading.Thread(target=drain_lines, args=(s, lines), daemon=True).start()
 
-        welcome_raw = recv_line(s)
-        welcome = json.loads(welcome_raw)
+        welcome_raw = next_line(lines)
+        welcome = json_loads(welcome_raw)
         my_id = welcome["id"]
         print("Connected. Your relay ID (P2):", my_id)
         print("Share this ID with the host (P1).")
@@ -41,9 +131,9 @@ def run_client(host="127.0.0.1", port=9000):
                 relay_send(s, "server", "LIST")
                 # wait for a LIST response
                 while True:
-                    line = recv_line(s)
+                    line = next_line(lines)
                     try:
-                        msg = json.loads(line)
+                        msg = json_loads(line)
                     except json.JSONDecodeError:
                         continue
                     payload = msg.get("payload", "")
@@ -58,32 +148,30 @@ def run_client(host="127.0.0.1", port=9000):
         print("Waiting for game messages...")
         while True:
             try:
-                line = recv_line(s)
+                line = next_line(lines)
             except ConnectionError as e:
                 print(f"Disconnected: {e}")
                 break
 
+            literal = payload_literal(line)
+            if literal[:5] == b'"END:':
+                print("Game ended by server.")
+                break
+
             try:
-                msg = json.loads(line)
+                payload = decode_payload(line, literal)
             except json.JSONDecodeError:
-                print("Invalid message from relay:", line)
+                print("Invalid message from relay:", line.decode("utf-8", "replace"))
                 continue
 
-            payload = msg.get("payload", "")
-
-            if payload.startswith("MSG:"):
-                msg_text = payload[len("MSG:"):].strip()
-                print(msg_text)
+            # Byte prefixes include the literal's opening quote; the payload offsets do not
+            if literal[:5] == b'"MSG:':
+                print(payload[4:])
 
-            elif payload.startswith("PROMPT:"):
-                prompt = payload[len("PROMPT:"):].strip()
-                resp = input(prompt)
+            elif literal[:8] == b'"PROMPT:':
+                resp = input(payload[7:])
                 relay_send(s, other_id, f"ACTION:{resp}")
 
-            elif payload.startswith("END:"):
-                print("Game ended by server.")
-                break
-
             else:
                 print(payload)
 
@@ -1,106 +1,231 @@
 import random
-from collections import Counter
-from itertools import combinations
+from bisect import bisect_left
 
 
 suits = ["♠", "♥", "♦", "♣"]
 ranks = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
 rank_values = {r: i for i, r in enumerate(ranks, start=2)}
-value_to_rank = {v: r for r, v in rank_values.items()}
-
-HAND_NAMES = {
-    8: "Straight Flush",
-    7: "Four of a Kind",
-    6: "Full House",
-    5: "Flush",
-    4: "Straight",
-    3: "Three of a Kind",
-    2: "Two Pair",
-    1: "One Pair",
-    0: "High Card",
-}
+VALUE_TO_RANK = ("?", "?") + tuple(ranks)  # indexed by rank value 2-14
+suit_index = {s: i for i, s in enumerate(suits)}
+
+# Rank bitmask of each straight (bit 0 = "2" ... bit 12 = "A") with its high card,
+# best first; the last entry is the wheel A-2-3-4-5.
+STRAIGHT_MASKS = tuple((0b11111 << i, i + 6) for i in range(8, -1, -1)) + ((0b1_0000_0000_1111, 5),)
+
+HAND_NAMES = (  # indexed by hand category
+    "High Card",
+    "One Pair",
+    "Two Pair",
+    "Three of a Kind",
+    "Straight",
+    "Flush",
+    "Full House",
+    "Four of a Kind",
+    "Straight Flush",
+)
 
 SMALL_BLIND = 5
 BIG_BLIND = 10
 
+PREFLOP_SAMPLES = 1000
+EQUITY_SAMPLES = 200
+
 class Card:
+    __slots__ = ("rank", "suit", "value", "suit_index", "label")
+
     def __init__(self, rank, suit):
         self.rank = rank
         self.suit = suit
         self.value = rank_values[rank]
+        self.suit_index = suit_index[suit]
+        self.label = f"{rank}{suit}"
 
     def __repr__(self):
-        return f"{self.rank}{self.suit}"
+        return self.label
+
+# The 52 cards are immutable, so every Deck shares these instances
+ALL_CARDS = tuple(Card(r, s) for r in ranks for s in suits)
 
 class Deck:
     def __init__(self):
-        self.cards = [Card(r, s) for r in ranks for s in suits]
-        random.shuffle(self.cards)
+        self.cards = list(ALL_CARDS)
+        self.cursor = len(self.cards)
 
     def deal(self, n=1):
-        return [self.cards.pop() for _ in range(n)]
-
-
-def evaluate_hand(cards):
-    values = sorted([c.value for c in cards], reverse=True)
-    suits_list = [c.suit for c in cards]
-    ranks_list = [c.rank for c in cards]
-
-    counts = Counter(ranks_list)
-    most_common = counts.most_common()
-
-    is_flush = len(set(suits_list)) == 1
-
-    uniq_vals = sorted(set(values))
-    is_straight = len(uniq_vals) == 5 and uniq_vals[-1] - uniq_vals[0] == 4
-
-    if is_flush and is_straight:
-        return (8, values)
-    if most_common[0][1] == 4:
-        return (7, values)
-    if most_common[0][1] == 3 and most_common[1][1] == 2:
-        return (6, values)
-    if is_flush:
-        return (5, values)
-    if is_straight:
-        return (4, values)
-    if most_common[0][1] == 3:
-        return (3, values)
-    if most_common[0][1] == 2 and most_common[1][1] == 2:
-        return (2, values)
-    if most_common[0][1] == 2:
-        return (1, values)
-    return (0, values)
-
-def best_five_of_seven(cards):
-    best = (-1, [])
-    for combo in combinations(cards, 5):
-        score = evaluate_hand(combo)
-        if score > best:
-            best = score
-    return best
+        # Partial Fisher-Yates: a hand uses at most 9 cards, so only those are shuffled
+        cards = self.cards
+        for _ in range(n):
+            j = random.randrange(self.cursor)
+            self.cursor -= 1
+            cards[j], cards[self.cursor] = cards[self.cursor], cards[j]
+        return cards[self.cursor:self.cursor + n]
+
+
+def _straight_high(rank_mask):
+    for mask, high in STRAIGHT_MASKS:
+        if rank_mask & mask == mask:
+            return high
+    return 0
+
+def _kickers(rank_counts, exclude, n):
+    return [v for v in range(14, 1, -1) if rank_counts[v] and v not in exclude][:n]
+
+def pack_score(category, values):
+    # category in bits 20-23, then up to five 4-bit values (2-14), zero padded,
+    # so comparing two scores as plain ints orders the hands
+    score = category
+    for i in range(5):
+        score = (score << 4) | (values[i] if i < len(values) else 0)
+    return score
+
+def card_arrays(cards):
+    return [c.value for c in cards], [c.suit_index for c in cards]
+
+def score7(ranks, suits):
+    # Scores 5 to 7 cards given as parallel rank (2-14) and suit (0-3) lists.
+    # The best five-card hand is read off the rank counts and suit masks
+    # instead of scoring every 5-card subset; higher packed score wins.
+    rank_counts = [0] * 15
+    suit_counts = [0] * 4
+    suit_masks = [0] * 4
+    rank_mask = 0
+    for i in range(len(ranks)):
+        v = ranks[i]
+        s = suits[i]
+        bit = 1 << (v - 2)
+        rank_counts[v] += 1
+        suit_counts[s] += 1
+        suit_masks[s] |= bit
+        rank_mask |= bit
+
+    flush_mask = 0
+    for s in range(4):
+        if suit_counts[s] >= 5:
+            flush_mask = suit_masks[s]
+    if flush_mask:
+        high = _straight_high(flush_mask)
+        if high:
+            return pack_score(8, (high,))
+
+    groups = sorted(((n, v) for v, n in enumerate(rank_counts) if n), reverse=True)
+    top, top_val = groups[0]
+    second, second_val = groups[1] if len(groups) > 1 else (0, 0)
+
+    if top == 4:
+        return pack_score(7, [top_val] * 4 + _kickers(rank_counts, (top_val,), 1))
+    if top == 3 and second >= 2:
+        return pack_score(6, [top_val] * 3 + [second_val] * 2)
+    if flush_mask:
+        return pack_score(5, [v for v in range(14, 1, -1) if flush_mask >> (v - 2) & 1][:5])
+    high = _straight_high(rank_mask)
+    if high:
+        return pack_score(4, (high,))
+    if top == 3:
+        return pack_score(3, [top_val] * 3 + _kickers(rank_counts, (top_val,), 2))
+    if top == 2 and second == 2:
+        return pack_score(2, [top_val] * 2 + [second_val] * 2 + _kickers(rank_counts, (top_val, second_val), 1))
+    if top == 2:
+        return pack_score(1, [top_val] * 2 + _kickers(rank_counts, (top_val,), 3))
+    return pack_score(0, _kickers(rank_counts, (), 5))
 
 def hand_description(score):
-    rank_score, values = score
-    name = HAND_NAMES.get(rank_score, "Unknown")
-    high_val = values[0]
-    high_rank = value_to_rank.get(high_val, "?")
+    rank_score = score >> 20
+    name = HAND_NAMES[rank_score]
+    high_val = (score >> 16) & 0xF
+    high_rank = VALUE_TO_RANK[high_val]
     if rank_score == 0:
         return f"{name} ({high_rank} high)"
     return f"{name}, high card {high_rank}"
 
 
+def simulate_equity(hole, board, samples):
+    # Win rate of hole + board against one random hand, dealing out the rest of the board
+    dealt = hole + board
+    rest = [c for c in ALL_CARDS if c not in dealt]
+    missing = 5 - len(board)
+    wins = 0.0
+    for _ in range(samples):
+        drawn = random.sample(rest, 2 + missing)
+        runout = board + drawn[2:]
+        mine = score7(*card_arrays(hole + runout))
+        theirs = score7(*card_arrays(drawn[:2] + runout))
+        if mine > theirs:
+            wins += 1
+        elif mine == theirs:
+            wins += 0.5
+    return wins / samples
+
+# (high value, low value, suited) -> win rate against one random hand.
+# Each of the 169 starting hands is simulated the first time it is dealt.
+PREFLOP_STRENGTH = {}
+
+def preflop_strength(high, low, suited):
+    key = (high, low, suited)
+    if key not in PREFLOP_STRENGTH:
+        hero = [ALL_CARDS[(high - 2) * 4], ALL_CARDS[(low - 2) * 4 + (0 if suited else 1)]]
+        PREFLOP_STRENGTH[key] = simulate_equity(hero, [], PREFLOP_SAMPLES)
+    return PREFLOP_STRENGTH[key]
+
 def estimate_cpu_strength(cpu_cards, community):
-    total = cpu_cards + community
-    if len(total) >= 5:
-        rank_score, values = best_five_of_seven(total)
-        rank_norm = rank_score / 8.0
-        high_norm = values[0] / 14.0
-        strength = 0.6 * rank_norm + 0.4 * high_norm
-    else:
-        values = [c.value for c in total]
-        strength = max(values) / 14.0
-    return max(0.0, min(1.0, strength))
+    if not community:
+        a, b = cpu_cards
+        return preflop_strength(max(a.value, b.value), min(a.value, b.value), a.suit == b.suit)
+    return simulate_equity(cpu_cards, community, EQUITY_SAMPLES)
+
+
+def _cpu_choices(strength, state):
+    facing_bet, raise_used, can_raise = state & 4, state & 2, state & 1
+    if facing_bet:
+        if not can_raise:
+            # Only call (all-in) or fold
+            return ("match",) if strength > 0.25 else ("match", "fold")
+        if raise_used:
+            # Can only match or fold
+            if strength > 0.6:
+                return ("match",)
+            if strength < 0.3:
+                return ("fold",)
+            return ("match", "fold")
+        # Can raise
+        if strength > 0.8:
+            return ("raise",)
+        if strength > 0.5:
+            return ("match", "raise")
+        if strength < 0.3:
+            return ("match", "fold")
+        return ("match",)
+    if not can_raise or raise_used:
+        return ("check",)
+    if strength > 0.8:
+        return ("raise",)
+    if strength > 0.5:
+        return ("check", "raise")
+    return ("check",)
+
+# Every strength _cpu_choices compares against. Its comparisons are strict, so
+# its answer is constant on each threshold and on each open gap between them.
+STRENGTH_THRESHOLDS = (0.25, 0.3, 0.5, 0.6, 0.8)
+
+def strength_bucket(strength):
+    # Even buckets are the gaps between thresholds, odd buckets the thresholds themselves
+    i = bisect_left(STRENGTH_THRESHOLDS, strength)
+    if i < len(STRENGTH_THRESHOLDS) and STRENGTH_THRESHOLDS[i] == strength:
+        return 2 * i + 1
+    return 2 * i
+
+def _bucket_strength(bucket):
+    # A strength that lands in the bucket, used to fill in its table row
+    if bucket % 2:
+        return STRENGTH_THRESHOLDS[bucket // 2]
+    edges = (0.0,) + STRENGTH_THRESHOLDS + (1.0,)
+    return (edges[bucket // 2] + edges[bucket // 2 + 1]) / 2
+
+# CPU_POLICY[strength bucket][state] -> actions to pick from uniformly, where
+# state packs (facing a bet, raise already used, chips left to raise) into 3 bits.
+CPU_POLICY = tuple(
+    tuple(_cpu_choices(_bucket_strength(b), state) for state in range(8))
+    for b in range(2 * len(STRENGTH_THRESHOLDS) + 1)
+)
 
 
 def betting_round(player_chips, cpu_chips, pot, stage,
@@ -205,48 +330,9 @@ def betting_round(player_chips, cpu_chips, pot, stage,
             to_call = current_bet - cpu_contrib
 
             # CPU action selection using strength + constraints
-            if to_call > 0:
-                if cpu_chips <= to_call:
-                    # Only call (all-in) or fold
-                    if cpu_strength > 0.25:
-                        cpu_action = "match"
-                    else:
-                        cpu_action = random.choice(["match", "fold"])
-                else:
-                    if raise_used:
-                        # Can only match or fold
-                        if cpu_strength > 0.6:
-                            cpu_action = "match"
-                        elif cpu_strength < 0.3:
-                            cpu_action = "fold"
-                        else:
-                            cpu_action = random.choice(["match", "fold"])
-                    else:
-                        # Can raise
-                        if cpu_strength > 0.8:
-                            cpu_action = "raise"
-                        elif cpu_strength > 0.5:
-                            cpu_action = random.choice(["match", "raise"])
-                        elif cpu_strength < 0.3:
-                            cpu_action = random.choice(["match", "fold"])
-                        else:
-                            cpu_action = "match"
-            else:
-                if cpu_chips == 0:
-                    cpu_action = "check"
-                else:
-                    if raise_used:
-                        if cpu_strength > 0.5:
-                            cpu_action = "check"
-                        else:
-                            cpu_action = "check"
-                    else:
-                        if cpu_strength > 0.8:
-                            cpu_action = "raise"
-                        elif cpu_strength > 0.5:
-                            cpu_action = random.choice(["check", "raise"])
-                        else:
-                            cpu_action = "check"
+            state = (to_call > 0) << 2 | raise_used << 1 | (cpu_chips > to_call)
+            choices = CPU_POLICY[strength_bucket(cpu_strength)][state]
+            cpu_action = choices[0] if len(choices) == 1 else random.choice(choices)
 
             if cpu_action == "fold":
                 print("CPU folds.")
@@ -289,176 +375,175 @@ def betting_round(player_chips, cpu_chips, pot, stage,
 
     return pot, player_chips, cpu_chips, player_in, cpu_in
 
+if __name__ == "__main__":
+    player_chips = 1000
+    cpu_chips = 1000
+    hand_number = 1
 
+    print("\nWelcome to Texas Hold'em Poker (Heads-Up)!")
+    print("Small blind:", SMALL_BLIND, "| Big blind:", BIG_BLIND)
+    print("Game continues until someone reaches $0 or you quit.\n")
 
-player_chips = 1000
-cpu_chips = 1000
-hand_number = 1
-
-print("\nWelcome to Texas Hold'em Poker (Heads-Up)!")
-print("Small blind:", SMALL_BLIND, "| Big blind:", BIG_BLIND)
-print("Game continues until someone reaches $0 or you quit.\n")
-
-while True:
-    print("\n====================================")
-    print(f"Hand #{hand_number}")
-    print(f"Your chips: {player_chips} | CPU chips: {cpu_chips}")
-    print("====================================")
-
-    if player_chips <= 0:
-        print("\nYou are out of chips. CPU wins the game.")
-        break
-    if cpu_chips <= 0:
-        print("\nCPU is out of chips. You win the game!")
-        break
-
-    choice = input("Press ENTER to play a hand, or type Q to quit: ").lower()
-    if choice == "q":
-        print("You quit the game.")
-        break
-
-    deck = Deck()
-    pot = 0
-
-    player = deck.deal(2)
-    cpu = deck.deal(2)
-
-    print("\nYour cards:", player)
-
-    # Blinds: player = small blind, CPU = big blind
-    sb = min(SMALL_BLIND, player_chips)
-    bb = min(BIG_BLIND, cpu_chips)
-
-    player_chips -= sb
-    cpu_chips -= bb
-    pot += sb + bb
-
-    player_contrib = sb
-    cpu_contrib = bb
-    current_bet = bb
+    while True:
+        print("\n====================================")
+        print(f"Hand #{hand_number}")
+        print(f"Your chips: {player_chips} | CPU chips: {cpu_chips}")
+        print("====================================")
 
-    print(f"\nYou post small blind: {sb}")
-    print(f"CPU posts big blind: {bb}")
-    print(f"Pot after blinds: {pot}")
+        if player_chips <= 0:
+            print("\nYou are out of chips. CPU wins the game.")
+            break
+        if cpu_chips <= 0:
+            print("\nCPU is out of chips. You win the game!")
+            break
 
-    print("\nYour cards:", player)
+        choice = input("Press ENTER to play a hand, or type Q to quit: ").lower()
+        if choice == "q":
+            print("You quit the game.")
+            break
 
-    # PRE-FLOP
-    cpu_strength = estimate_cpu_strength(cpu, [])
-    pot, player_chips, cpu_chips, p_in, c_in = betting_round(
-        player_chips, cpu_chips, pot,
-        "pre-flop",
-        cpu_strength,
-        current_bet=current_bet,
-        player_contrib=player_contrib,
-        cpu_contrib=cpu_contrib,
-        raise_used=False
-    )
+        deck = Deck()
+        pot = 0
+
+        player = deck.deal(2)
+        cpu = deck.deal(2)
+
+        print("\nYour cards:", player)
+
+        # Blinds: player = small blind, CPU = big blind
+        sb = min(SMALL_BLIND, player_chips)
+        bb = min(BIG_BLIND, cpu_chips)
+
+        player_chips -= sb
+        cpu_chips -= bb
+        pot += sb + bb
+
+        player_contrib = sb
+        cpu_contrib = bb
+        current_bet = bb
+
+        print(f"\nYou post small blind: {sb}")
+        print(f"CPU posts big blind: {bb}")
+        print(f"Pot after blinds: {pot}")
+
+        print("\nYour cards:", player)
+
+        # PRE-FLOP
+        cpu_strength = estimate_cpu_strength(cpu, [])
+        pot, player_chips, cpu_chips, p_in, c_in = betting_round(
+            player_chips, cpu_chips, pot,
+            "pre-flop",
+            cpu_strength,
+            current_bet=current_bet,
+            player_contrib=player_contrib,
+            cpu_contrib=cpu_contrib,
+            raise_used=False
+        )
+
+        if not p_in:
+            cpu_chips += pot
+            print(f"CPU wins the pot of {pot} (you folded pre-flop).")
+            hand_number += 1
+            continue
+        if not c_in:
+            player_chips += pot
+            print(f"You win the pot of {pot} (CPU folded pre-flop).")
+            hand_number += 1
+            continue
+
+        print("\nYour cards:", player)
+
+        # FLOP
+        community = deck.deal(3)
+        print("\nFlop:", community)
+
+        cpu_strength = estimate_cpu_strength(cpu, community)
+        pot, player_chips, cpu_chips, p_in, c_in = betting_round(
+            player_chips, cpu_chips, pot,
+            "flop",
+            cpu_strength
+        )
+        if not p_in:
+            cpu_chips += pot
+            print(f"CPU wins the pot of {pot} (you folded on the flop).")
+            hand_number += 1
+            continue
+        if not c_in:
+            player_chips += pot
+            print(f"You win the pot of {pot} (CPU folded on the flop).")
+            hand_number += 1
+            continue
+
+
+        print("\nYour cards:", player)
+
+        # TURN
+        community += deck.deal(1)
+        print("\nTurn:", community)
+
+        cpu_strength = estimate_cpu_strength(cpu, community)
+        pot, player_chips, cpu_chips, p_in, c_in = betting_round(
+            player_chips, cpu_chips, pot,
+            "turn",
+            cpu_strength
+        )
+        if not p_in:
+            cpu_chips += pot
+            print(f"CPU wins the pot of {pot} (you folded on the turn).")
+            hand_number += 1
+            continue
+        if not c_in:
+            player_chips += pot
+            print(f"You win the pot of {pot} (CPU folded on the turn).")
+            hand_number += 1
+            continue
+
+        print("\nYour cards:", player)
+
+        # RIVER
+        community += deck.deal(1)
+        print("\nRiver:", community)
+
+        cpu_strength = estimate_cpu_strength(cpu, community)
+        pot, player_chips, cpu_chips, p_in, c_in = betting_round(
+            player_chips, cpu_chips, pot,
+            "river",
+            cpu_strength
+        )
+        if not p_in:
+            cpu_chips += pot
+            print(f"CPU wins the pot of {pot} (you folded on the river).")
+            hand_number += 1
+            continue
+        if not c_in:
+            player_chips += pot
+            print(f"You win the pot of {pot} (CPU folded on the river).")
+            hand_number += 1
+            continue
+
+        # SHOWDOWN
+        print("\n--- SHOWDOWN ---")
+        print("Community cards:", community)
+        print("Your cards:     ", player)
+        print("CPU cards:      ", cpu)
+
+        player_best = score7(*card_arrays(player + community))
+        cpu_best = score7(*card_arrays(cpu + community))
+
+        print("\nYour hand:", hand_description(player_best))
+        print("CPU hand:", hand_description(cpu_best))
+
+        if player_best > cpu_best:
+            print(f"\nYou win the pot of {pot}!")
+            player_chips += pot
+        elif cpu_best > player_best:
+            print(f"\nCPU wins the pot of {pot}.")
+            cpu_chips += pot
+        else:
+            print("\nIt's a tie! Pot is split.")
+            player_chips += pot // 2
+            cpu_chips += pot // 2
 
-    if not p_in:
-        cpu_chips += pot
-        print(f"CPU wins the pot of {pot} (you folded pre-flop).")
-        hand_number += 1
-        continue
-    if not c_in:
-        player_chips += pot
-        print(f"You win the pot of {pot} (CPU folded pre-flop).")
-        hand_number += 1
-        continue
-
-    print("\nYour cards:", player)
-
-    # FLOP
-    community = deck.deal(3)
-    print("\nFlop:", community)
-
-    cpu_strength = estimate_cpu_strength(cpu, community)
-    pot, player_chips, cpu_chips, p_in, c_in = betting_round(
-        player_chips, cpu_chips, pot,
-        "flop",
-        cpu_strength
-    )
-    if not p_in:
-        cpu_chips += pot
-        print(f"CPU wins the pot of {pot} (you folded on the flop).")
         hand_number += 1
-        continue
-    if not c_in:
-        player_chips += pot
-        print(f"You win the pot of {pot} (CPU folded on the flop).")
-        hand_number += 1
-        continue
-
-
-    print("\nYour cards:", player)
-
-    # TURN
-    community += deck.deal(1)
-    print("\nTurn:", community)
 
-    cpu_strength = estimate_cpu_strength(cpu, community)
-    pot, player_chips, cpu_chips, p_in, c_in = betting_round(
-        player_chips, cpu_chips, pot,
-        "turn",
-        cpu_strength
-    )
-    if not p_in:
-        cpu_chips += pot
-        print(f"CPU wins the pot of {pot} (you folded on the turn).")
-        hand_number += 1
-        continue
-    if not c_in:
-        player_chips += pot
-        print(f"You win the pot of {pot} (CPU folded on the turn).")
-        hand_number += 1
-        continue
-
-    print("\nYour cards:", player)
-
-    # RIVER
-    community += deck.deal(1)
-    print("\nRiver:", community)
-
-    cpu_strength = estimate_cpu_strength(cpu, community)
-    pot, player_chips, cpu_chips, p_in, c_in = betting_round(
-        player_chips, cpu_chips, pot,
-        "river",
-        cpu_strength
-    )
-    if not p_in:
-        cpu_chips += pot
-        print(f"CPU wins the pot of {pot} (you folded on the river).")
-        hand_number += 1
-        continue
-    if not c_in:
-        player_chips += pot
-        print(f"You win the pot of {pot} (CPU folded on the river).")
-        hand_number += 1
-        continue
-
-    # SHOWDOWN
-    print("\n--- SHOWDOWN ---")
-    print("Community cards:", community)
-    print("Your cards:     ", player)
-    print("CPU cards:      ", cpu)
-
-    player_best = best_five_of_seven(player + community)
-    cpu_best = best_five_of_seven(cpu + community)
-
-    print("\nYour hand:", hand_description(player_best))
-    print("CPU hand:", hand_description(cpu_best))
-
-    if player_best > cpu_best:
-        print(f"\nYou win the pot of {pot}!")
-        player_chips += pot
-    elif cpu_best > player_best:
-        print(f"\nCPU wins the pot of {pot}.")
-        cpu_chips += pot
-    else:
-        print("\nIt's a tie! Pot is split.")
-        player_chips += pot // 2
-        cpu_chips += pot // 2
-
-    hand_number += 1
-
-print("\nThanks for playing!")
\ No newline at end of file
+    print("\nThanks for playing!")
\ No newline at end of file
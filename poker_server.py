@@ -1,122 +1,285 @@
+import asyncio
+import inspect
 import socket
+import os
+import sys
 import random
 import json
-from collections import Counter
-from itertools import combinations
+from dataclasses import dataclass
+from itertools import combinations, combinations_with_replacement
+
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
 
 suits = ["♠", "♥", "♦", "♣"]
 ranks = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
 rank_values = {r: i for i, r in enumerate(ranks, start=2)}
-value_to_rank = {v: r for r, v in rank_values.items()}
-
-HAND_NAMES = {
-    8: "Straight Flush",
-    7: "Four of a Kind",
-    6: "Full House",
-    5: "Flush",
-    4: "Straight",
-    3: "Three of a Kind",
-    2: "Two Pair",
-    1: "One Pair",
-    0: "High Card",
-}
+VALUE_TO_RANK = ("?", "?") + tuple(ranks)  # indexed by rank value 2-14
+
+HAND_NAMES = (  # indexed by hand category
+    "High Card",
+    "One Pair",
+    "Two Pair",
+    "Three of a Kind",
+    "Straight",
+    "Flush",
+    "Full House",
+    "Four of a Kind",
+    "Straight Flush",
+)
 
 SMALL_BLIND = 5
 BIG_BLIND = 10
 
-class Card:
-    def __init__(self, rank, suit):
-        self.rank = rank
-        self.suit = suit
-        self.value = rank_values[rank]
+PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+SUIT_BITS = {"♠": 1, "♥": 2, "♦": 4, "♣": 8}
+
+def _encode(rank, suit):
+    r = rank_values[rank] - 2
+    # Cactus Kev layout: rank bit in 16-28, suit bit in 12-15, rank index in 8-11, prime in 0-7
+    return (1 << (16 + r)) | (SUIT_BITS[suit] << 12) | (r << 8) | PRIMES[r]
 
-    def __repr__(self):
-        return f"{self.rank}{self.suit}"
+# A card is just its int code; these are built once and shared by every Deck
+DECK_CARDS = tuple(_encode(r, s) for r in ranks for s in suits)
+CARD_LABELS = {_encode(r, s): f"{r}{s}" for r in ranks for s in suits}
+
+def card_repr(code):
+    return CARD_LABELS[code]
+
+def cards_repr(cards):
+    # Same text as the list repr of the old Card objects, e.g. "[A♠, 10♦]"
+    return "[" + ", ".join(map(card_repr, cards)) + "]"
+
+HAND_CARDS = 9  # two hole cards each plus five community cards
 
 class Deck:
     def __init__(self):
-        self.cards = [Card(r, s) for r in ranks for s in suits]
-        random.shuffle(self.cards)
+        # Draw only the cards a heads-up hand can use instead of shuffling all 52
+        self.cards = random.sample(DECK_CARDS, HAND_CARDS)
+        self.pos = 0
 
     def deal(self, n=1):
-        return [self.cards.pop() for _ in range(n)]
-
-def evaluate_hand(cards):
-    values = sorted([c.value for c in cards], reverse=True)
-    suits_list = [c.suit for c in cards]
-    ranks_list = [c.rank for c in cards]
-
-    counts = Counter(ranks_list)
-    most_common = counts.most_common()
-
-    is_flush = len(set(suits_list)) == 1
-
-    uniq_vals = sorted(set(values))
-    is_straight = len(uniq_vals) == 5 and uniq_vals[-1] - uniq_vals[0] == 4
-
-    if is_flush and is_straight:
-        return (8, values)
-    if most_common[0][1] == 4:
-        return (7, values)
-    if most_common[0][1] == 3 and most_common[1][1] == 2:
-        return (6, values)
-    if is_flush:
-        return (5, values)
-    if is_straight:
-        return (4, values)
-    if most_common[0][1] == 3:
-        return (3, values)
-    if most_common[0][1] == 2 and most_common[1][1] == 2:
-        return (2, values)
-    if most_common[0][1] == 2:
-        return (1, values)
-    return (0, values)
+        end = self.pos + n
+        if end > len(self.cards):
+            # Past one hand's worth: top up from the cards not drawn yet
+            rest = [c for c in DECK_CARDS if c not in self.cards]
+            self.cards += random.sample(rest, end - len(self.cards))
+        dealt = self.cards[self.pos:end]
+        self.pos = end
+        return dealt
+
+# Hand ranks run from 1 (royal flush) to 7462 (7-5-4-3-2 offsuit); lower is better.
+FLUSH_LOOKUP = {}     # 13-bit rank mask of a five-card flush -> hand rank
+UNSUITED_LOOKUP = {}  # product of the five rank primes -> hand rank
+HAND_CLASS = [None]   # hand rank -> (HAND_NAMES index, value of the leading rank)
+# Same keys extended to 5-7 cards, giving the rank of the best five-card hand inside
+FLUSH7_LOOKUP = {}
+UNSUITED7_LOOKUP = {}
+
+def _prime_product(rank_idxs):
+    product = 1
+    for r in rank_idxs:
+        product *= PRIMES[r]
+    return product
+
+def _init_tables():
+    # Walk the 7462 equivalence classes from best to worst, numbering as we go
+    desc = range(12, -1, -1)
+    straights = [(0b11111 << i, i + 4) for i in range(8, -1, -1)] + [(0b1_0000_0000_1111, 3)]
+    straight_masks = {mask for mask, _ in straights}
+    # Five distinct ranks that don't form a straight, best first
+    plain = [c for c in combinations(desc, 5) if sum(1 << r for r in c) not in straight_masks]
+
+    def add(table, key, category, lead):
+        table[key] = len(HAND_CLASS)
+        HAND_CLASS.append((category, lead + 2))
+
+    for mask, high in straights:
+        add(FLUSH_LOOKUP, mask, 8, high)
+    for quad in desc:
+        for kicker in desc:
+            if kicker != quad:
+                add(UNSUITED_LOOKUP, PRIMES[quad] ** 4 * PRIMES[kicker], 7, quad)
+    for trip in desc:
+        for pair in desc:
+            if pair != trip:
+                add(UNSUITED_LOOKUP, PRIMES[trip] ** 3 * PRIMES[pair] ** 2, 6, trip)
+    for c in plain:
+        add(FLUSH_LOOKUP, sum(1 << r for r in c), 5, c[0])
+    for mask, high in straights:
+        add(UNSUITED_LOOKUP, _prime_product(r for r in desc if mask >> r & 1), 4, high)
+    for trip in desc:
+        for kickers in combinations([r for r in desc if r != trip], 2):
+            add(UNSUITED_LOOKUP, PRIMES[trip] ** 3 * _prime_product(kickers), 3, trip)
+    for high_pair, low_pair in combinations(desc, 2):
+        for kicker in desc:
+            if kicker != high_pair and kicker != low_pair:
+                add(UNSUITED_LOOKUP, PRIMES[high_pair] ** 2 * PRIMES[low_pair] ** 2 * PRIMES[kicker], 2, high_pair)
+    for pair in desc:
+        for kickers in combinations([r for r in desc if r != pair], 3):
+            add(UNSUITED_LOOKUP, PRIMES[pair] ** 2 * _prime_product(kickers), 1, pair)
+    for c in plain:
+        add(UNSUITED_LOOKUP, _prime_product(c), 0, c[0])
+
+def _init_seven_card_tables():
+    # Best-of-n for n cards is the best of the n ways to drop one card, so each
+    # size builds on the one below instead of scoring every 5-card subset
+    FLUSH7_LOOKUP.update(FLUSH_LOOKUP)
+    UNSUITED7_LOOKUP.update(UNSUITED_LOOKUP)
+    for n in (6, 7):
+        for c in combinations(range(13), n):
+            mask = sum(1 << r for r in c)
+            FLUSH7_LOOKUP[mask] = min(FLUSH7_LOOKUP[mask ^ (1 << r)] for r in c)
+        for c in combinations_with_replacement(range(13), n):
+            if any(c[i] == c[i + 4] for i in range(n - 4)):
+                continue  # five of a kind
+            product = _prime_product(c)
+            UNSUITED7_LOOKUP[product] = min(UNSUITED7_LOOKUP[product // PRIMES[r]] for r in set(c))
+
+_init_tables()
+_init_seven_card_tables()
 
 def best_five_of_seven(cards):
-    best = (-1, [])
-    for combo in combinations(cards, 5):
-        score = evaluate_hand(combo)
-        if score > best:
-            best = score
-    return best
-
-def hand_description(score):
-    rank_score, values = score
-    name = HAND_NAMES.get(rank_score, "Unknown")
-    high_val = values[0]
-    high_rank = value_to_rank.get(high_val, "?")
+    # Five or more cards of one suit can't also hold quads or a full house, so
+    # the flush table alone decides those hands
+    suit_masks = [0] * 9  # indexed by suit bit
+    suit_counts = [0] * 9
+    product = 1
+    for bits in cards:
+        s = (bits >> 12) & 0xF
+        suit_masks[s] |= bits >> 16
+        suit_counts[s] += 1
+        product *= bits & 0xFF
+    for s in (1, 2, 4, 8):
+        if suit_counts[s] >= 5:
+            return FLUSH7_LOOKUP[suit_masks[s]]
+    return UNSUITED7_LOOKUP[product]
+
+def _describe(rank_score, high_val):
+    name = HAND_NAMES[rank_score]
+    high_rank = VALUE_TO_RANK[high_val]
     if rank_score == 0:
         return f"{name} ({high_rank} high)"
     return f"{name}, high card {high_rank}"
 
-def send_line(conn, msg: str):
-    if not msg.endswith("\n"):
-        msg += "\n"
-    conn.sendall(msg.encode("utf-8"))
+# Only (category, leading rank) shows up in the text, so the 7462 entries
+# share about a hundred distinct strings
+_descriptions = {cls: _describe(*cls) for cls in set(HAND_CLASS[1:])}
+HAND_DESCRIPTIONS = [None] + [_descriptions[cls] for cls in HAND_CLASS[1:]]
+del _descriptions
 
-def recv_line(conn) -> str:
-    data = b""
-    while True:
-        chunk = conn.recv(1)
-        if not chunk:
+def hand_description(score):
+    return HAND_DESCRIPTIONS[score]
+
+class BufferedConn:
+    # Wraps the relay streams so outgoing lines pile up until flush() hands
+    # them to the transport in one write. The event loop keeps reading the
+    # socket into the StreamReader, even while the host is typing.
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self._wbuf = bytearray()
+
+    def write(self, line: bytes):
+        self._wbuf += line
+
+    async def flush(self):
+        if self._wbuf:
+            self.writer.write(bytes(self._wbuf))
+            self._wbuf.clear()
+            await self.writer.drain()
+
+    async def recv_line(self) -> bytes:
+        line = await self.reader.readline()
+        if not line.endswith(b"\n"):
             raise ConnectionError("Connection closed.")
-        if chunk == b"\n":
-            break
-        data += chunk
-    return data.decode("utf-8").strip()
+        return line[:-1]
 
-def local_input(prompt: str) -> str:
-    return input(prompt)
+class StdinReader:
+    # Reads stdin straight from its file descriptor: sys.stdin reads ahead on
+    # pipes, which would leave lines buffered where the event loop can't see them
+    def __init__(self):
+        self.fd = sys.stdin.fileno()
+        self._buf = bytearray()
 
-def relay_send(sock, to_id, payload: str):
-    msg = {"to": to_id, "payload": payload}
-    send_line(sock, json.dumps(msg))
+    def fill(self):
+        chunk = os.read(self.fd, 4096)
+        if not chunk:
+            if not self._buf:
+                raise EOFError
+            chunk = b"\n"  # hand out a final unterminated line, like input()
+        self._buf += chunk
+
+    def pop_line(self):
+        idx = self._buf.find(b"\n")
+        if idx == -1:
+            return None
+        line = bytes(self._buf[:idx])
+        del self._buf[:idx + 1]
+        return line.decode("utf-8", "replace").rstrip("\r")
+
+    def _readable(self):
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        try:
+            loop.add_reader(self.fd, self._on_readable, loop, ready)
+        except PermissionError:
+            ready.set_result(None)  # a regular file can't be polled, but never blocks
+        return ready
+
+    def _on_readable(self, loop, ready):
+        loop.remove_reader(self.fd)
+        if not ready.done():
+            ready.set_result(None)
+
+    async def readline(self) -> str:
+        line = self.pop_line()
+        while line is None:
+            await self._readable()
+            self.fill()
+            line = self.pop_line()
+        return line
+
+stdin_lines = StdinReader()
+
+async def local_input(prompt: str, conn=None) -> str:
+    if conn is not None:
+        await conn.flush()  # the opponent sees everything so far while the host decides
+    if os.name != "posix":  # the Windows event loop can't watch stdin
+        return await asyncio.get_running_loop().run_in_executor(None, input, prompt)
+    print(prompt, end="", flush=True)
+    return await stdin_lines.readline()
 
-def remote_input(sock, to_id, prompt: str) -> str:
+def relay_send(sock, to_id, payload: str):
+    sock.write(json_dumps({"to": to_id, "payload": payload}) + b"\n")
+
+def _template(payload: str) -> bytes:
+    # relay_send's line for a fixed payload, encoded once; the "to" field is
+    # left as a %s slot for the JSON-encoded relay ID
+    return b'{"to":%s,"payload":' + json_dumps(payload) + b"}\n"
+
+TPL_WELCOME = _template("MSG:Welcome to Texas Hold'em Poker (Heads-Up) - You are PLAYER 2.")
+TPL_BLINDS = _template(f"MSG:Small blind: {SMALL_BLIND} | Big blind: {BIG_BLIND}")
+TPL_RULE = _template("MSG:====================================")
+TPL_HAND = _template("MSG:Hand #%d")
+TPL_SHOWDOWN = _template("MSG:--- SHOWDOWN ---")
+TPL_TIE = _template("MSG:It's a tie! Pot is split.")
+TPL_THANKS = _template("MSG:Thanks for playing!")
+TPL_END = _template("END:")
+
+async def remote_input(sock, to_id, prompt: str) -> str:
     relay_send(sock, to_id, f"PROMPT:{prompt}")
+    await sock.flush()
     while True:
-        raw = recv_line(sock)
-        msg = json.loads(raw)
+        raw = await sock.recv_line()
+        msg = json_loads(raw)
         payload = msg.get("payload", "")
         if payload.startswith("ACTION:"):
             return payload[len("ACTION:"):].strip()
@@ -125,252 +288,225 @@ def remote_input(sock, to_id, prompt: str) -> str:
 def remote_message(sock, to_id, msg: str):
     relay_send(sock, to_id, f"MSG:{msg}")
 
-def betting_round(
+class LocalPlayer:
+    # The host, playing at this terminal
+    def __init__(self, sock):
+        self.sock = sock
+
+    async def prompt(self, prompt: str) -> str:
+        return await local_input(prompt, self.sock)
+
+    def send(self, msg: str):
+        print(msg)
+
+class RemotePlayer:
+    # The opponent, reached through the relay
+    def __init__(self, sock, pid):
+        self.sock = sock
+        self.pid = pid
+
+    async def prompt(self, prompt: str) -> str:
+        return await remote_input(self.sock, self.pid, prompt)
+
+    def send(self, msg: str):
+        remote_message(self.sock, self.pid, msg)
+
+@dataclass
+class BettingState:
+    # Per-seat lists are indexed 0 for P1 and 1 for P2
+    players: tuple
+    chips: list
+    contrib: list
+    in_hand: list
+    all_in: list
+    pot: int
+    current_bet: int
+    last_raiser: int | None = None
+    last_broadcast: tuple | None = None  # (pot, P1 chips, P2 chips, current bet) last shown
+
+# Each handler applies one action for seat i and returns False when the
+# player has to act again (an invalid action or amount). Handlers that wait
+# on the player, like _raise for its amount, are coroutines
+
+def _fold(state, i):
+    player, opponent = state.players[i], state.players[1 - i]
+    print(f"P{i + 1} folds.")
+    player.send("You fold.")
+    opponent.send("Opponent folds.")
+    state.in_hand[i] = False
+    return True
+
+def _allin(state, i):
+    player, opponent = state.players[i], state.players[1 - i]
+    bet_amt = state.chips[i]
+    state.chips[i] -= bet_amt
+    state.contrib[i] += bet_amt
+    state.pot += bet_amt
+    print(f"P{i + 1} goes all-in for {bet_amt}.")
+    player.send(f"You go all-in for {bet_amt}.")
+    opponent.send(f"Opponent goes all-in for {bet_amt}.")
+    if state.contrib[i] > state.current_bet:
+        state.current_bet = state.contrib[i]
+        state.last_raiser = i
+    state.all_in[i] = True
+    return True
+
+def _call(state, i):
+    player, opponent = state.players[i], state.players[1 - i]
+    call_amt = min(state.current_bet - state.contrib[i], state.chips[i])
+    state.chips[i] -= call_amt
+    state.contrib[i] += call_amt
+    state.pot += call_amt
+    print(f"P{i + 1} calls {call_amt}.")
+    player.send(f"You call {call_amt}.")
+    opponent.send(f"Opponent calls {call_amt}.")
+    if state.chips[i] == 0:
+        print(f"P{i + 1} is all-in.")
+        player.send("You are all-in.")
+        state.all_in[i] = True
+    return True
+
+def _check(state, i):
+    player, opponent = state.players[i], state.players[1 - i]
+    if state.current_bet > state.contrib[i]:
+        player.send("You cannot check; you must call, all-in, or fold.")
+        print(f"P{i + 1} cannot check; must call/all-in/fold.")
+        return False
+    print(f"P{i + 1} checks.")
+    player.send("You check.")
+    opponent.send("Opponent checks.")
+    return True
+
+async def _raise(state, i):
+    player, opponent = state.players[i], state.players[1 - i]
+    amt_str = (await player.prompt(f"P{i + 1}: Enter raise amount: ")).strip()
+    try:
+        raise_amt = int(amt_str)
+    except ValueError:
+        player.send("Invalid raise.")
+        print("Invalid raise.")
+        return False
+
+    if raise_amt <= 0 or raise_amt > state.chips[i]:
+        player.send("Invalid raise amount.")
+        print("Invalid raise amount.")
+        return False
+
+    state.chips[i] -= raise_amt
+    state.contrib[i] += raise_amt
+    state.pot += raise_amt
+    state.current_bet = state.contrib[i]
+    state.last_raiser = i
+    print(f"P{i + 1} raises to {state.current_bet}.")
+    player.send(f"You raise to {state.current_bet}.")
+    opponent.send(f"Opponent raises to {state.current_bet}.")
+    if state.chips[i] == 0:
+        print(f"P{i + 1} is all-in.")
+        player.send("You are all-in.")
+        state.all_in[i] = True
+    return True
+
+def _invalid(state, i):
+    state.players[i].send("Invalid action.")
+    print(f"Invalid action from P{i + 1}.")
+    return False
+
+STATE_TPL = "Pot: %d | P1 chips: %d | P2 chips: %d | Current bet: %d"
+
+ACTIONS = {
+    "fold": _fold,
+    "all-in": _allin,
+    "call": _call,
+    "check": _check,
+    "bet": _raise,
+    "raise": _raise,
+}
+
+def _state_broadcast(state):
+    # Shows the pot/chips line to everyone, unless nothing moved since the last one
+    snapshot = (state.pot, state.chips[0], state.chips[1], state.current_bet)
+    if snapshot == state.last_broadcast:
+        return
+    state.last_broadcast = snapshot
+    state_line = STATE_TPL % snapshot
+    print("\n" + state_line)
+    for player in state.players:
+        player.send(state_line)
+
+async def _player_turn(state, i):
+    # Asks seat i for one action and applies it; False means the orbit restarts
+    if state.current_bet > state.contrib[i]:
+        prompt = f"P{i + 1}: call / raise / fold (or 'all-in'): "
+    else:
+        prompt = f"P{i + 1}: check / bet / fold (or 'all-in'): "
+    action = (await state.players[i].prompt(prompt)).lower()
+    result = ACTIONS.get(action, _invalid)(state, i)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+async def betting_round(
+    p1, p2,
     p1_chips, p2_chips, pot, stage,
     current_bet=0, p1_contrib=0, p2_contrib=0,
-    p1_input_func=None,
-    p2_input_func=None,
-    p1_message_func=None,
-    p2_message_func=None,
 ):
     print(f"\n--- {stage.upper()} BETTING ROUND ---")
-    if p1_message_func:
-        p1_message_func(f"--- {stage.upper()} BETTING ROUND ---")
-    if p2_message_func:
-        p2_message_func(f"--- {stage.upper()} BETTING ROUND ---")
-
-    p1_in = True
-    p2_in = True
-    p1_all_in = (p1_chips == 0)
-    p2_all_in = (p2_chips == 0)
-    last_raiser = None
+    p1.send(f"--- {stage.upper()} BETTING ROUND ---")
+    p2.send(f"--- {stage.upper()} BETTING ROUND ---")
+
+    state = BettingState(
+        players=(p1, p2),
+        chips=[p1_chips, p2_chips],
+        contrib=[p1_contrib, p2_contrib],
+        in_hand=[True, True],
+        all_in=[p1_chips == 0, p2_chips == 0],
+        pot=pot,
+        current_bet=current_bet,
+    )
+    chips, contrib, all_in = state.chips, state.contrib, state.all_in
 
     while True:
-        state_line = (
-            f"Pot: {pot} | P1 chips: {p1_chips} | P2 chips: {p2_chips} | "
-            f"Current bet: {current_bet}"
-        )
-        print("\n" + state_line)
-        if p1_message_func:
-            p1_message_func(state_line)
-        if p2_message_func:
-            p2_message_func(state_line)
+        _state_broadcast(state)
 
-        if (p1_all_in or p2_all_in) and p1_contrib == p2_contrib:
+        if all_in[0] and all_in[1]:
+            break  # nobody can act, even if one all-in came up short
+        if (all_in[0] or all_in[1]) and contrib[0] == contrib[1]:
             break
 
-        if p1_in and not p1_all_in:
-            to_call = current_bet - p1_contrib
-
-            if to_call > 0:
-                prompt = "P1: call / raise / fold (or 'all-in'): "
-            else:
-                prompt = "P1: check / bet / fold (or 'all-in'): "
-
-            action = p1_input_func(prompt).lower()
-
-            if action == "fold":
-                print("P1 folds.")
-                if p1_message_func:
-                    p1_message_func("You fold.")
-                if p2_message_func:
-                    p2_message_func("Opponent folds.")
-                return pot, p1_chips, p2_chips, False, p2_in
-
-            elif action == "all-in":
-                bet_amt = p1_chips
-                p1_chips -= bet_amt
-                p1_contrib += bet_amt
-                pot += bet_amt
-                print(f"P1 goes all-in for {bet_amt}.")
-                if p1_message_func:
-                    p1_message_func(f"You go all-in for {bet_amt}.")
-                if p2_message_func:
-                    p2_message_func(f"Opponent goes all-in for {bet_amt}.")
-                if p1_contrib > current_bet:
-                    current_bet = p1_contrib
-                    last_raiser = "p1"
-                p1_all_in = True
-
-            elif action == "call":
-                call_amt = min(to_call, p1_chips)
-                p1_chips -= call_amt
-                p1_contrib += call_amt
-                pot += call_amt
-                print(f"P1 calls {call_amt}.")
-                if p1_message_func:
-                    p1_message_func(f"You call {call_amt}.")
-                if p2_message_func:
-                    p2_message_func(f"Opponent calls {call_amt}.")
-                if p1_chips == 0:
-                    print("P1 is all-in.")
-                    if p1_message_func:
-                        p1_message_func("You are all-in.")
-                    p1_all_in = True
-
-            elif action == "check":
-                if to_call > 0:
-                    if p1_message_func:
-                        p1_message_func("You cannot check; you must call, all-in, or fold.")
-                    print("P1 cannot check; must call/all-in/fold.")
-                    continue
-                print("P1 checks.")
-                if p1_message_func:
-                    p1_message_func("You check.")
-                if p2_message_func:
-                    p2_message_func("Opponent checks.")
-
-            elif action in ("bet", "raise"):
-                try:
-                    amt_str = p1_input_func("P1: Enter raise amount: ")
-                    raise_amt = int(amt_str)
-                except:
-                    if p1_message_func:
-                        p1_message_func("Invalid raise.")
-                    print("Invalid raise.")
-                    continue
-
-                if raise_amt <= 0 or raise_amt > p1_chips:
-                    if p1_message_func:
-                        p1_message_func("Invalid raise amount.")
-                    print("Invalid raise amount.")
-                    continue
-
-                p1_chips -= raise_amt
-                p1_contrib += raise_amt
-                pot += raise_amt
-                current_bet = p1_contrib
-                last_raiser = "p1"
-                print(f"P1 raises to {current_bet}.")
-                if p1_message_func:
-                    p1_message_func(f"You raise to {current_bet}.")
-                if p2_message_func:
-                    p2_message_func(f"Opponent raises to {current_bet}.")
-                if p1_chips == 0:
-                    print("P1 is all-in.")
-                    if p1_message_func:
-                        p1_message_func("You are all-in.")
-                    p1_all_in = True
-            else:
-                if p1_message_func:
-                    p1_message_func("Invalid action.")
-                print("Invalid action from P1.")
-                continue
-
-        if p2_in and not p2_all_in:
-            to_call = current_bet - p2_contrib
-
-            if to_call > 0:
-                prompt = "P2: call / raise / fold (or 'all-in'): "
-            else:
-                prompt = "P2: check / bet / fold (or 'all-in'): "
-
-            action = p2_input_func(prompt).lower()
-
-            if action == "fold":
-                print("P2 folds.")
-                if p2_message_func:
-                    p2_message_func("You fold.")
-                if p1_message_func:
-                    p1_message_func("Opponent folds.")
-                return pot, p1_chips, p2_chips, p1_in, False
-
-            elif action == "all-in":
-                bet_amt = p2_chips
-                p2_chips -= bet_amt
-                p2_contrib += bet_amt
-                pot += bet_amt
-                print(f"P2 goes all-in for {bet_amt}.")
-                if p2_message_func:
-                    p2_message_func(f"You go all-in for {bet_amt}.")
-                if p1_message_func:
-                    p1_message_func(f"Opponent goes all-in for {bet_amt}.")
-                if p2_contrib > current_bet:
-                    current_bet = p2_contrib
-                    last_raiser = "p2"
-                p2_all_in = True
-
-            elif action == "call":
-                call_amt = min(to_call, p2_chips)
-                p2_chips -= call_amt
-                p2_contrib += call_amt
-                pot += call_amt
-                print(f"P2 calls {call_amt}.")
-                if p2_message_func:
-                    p2_message_func(f"You call {call_amt}.")
-                if p1_message_func:
-                    p1_message_func(f"Opponent calls {call_amt}.")
-                if p2_chips == 0:
-                    print("P2 is all-in.")
-                    if p2_message_func:
-                        p2_message_func("You are all-in.")
-                    p2_all_in = True
-
-            elif action == "check":
-                if to_call > 0:
-                    if p2_message_func:
-                        p2_message_func("You cannot check; you must call, all-in, or fold.")
-                    print("P2 cannot check; must call/all-in/fold.")
-                    continue
-                print("P2 checks.")
-                if p2_message_func:
-                    p2_message_func("You check.")
-                if p1_message_func:
-                    p1_message_func("Opponent checks.")
-
-            elif action in ("bet", "raise"):
-                try:
-                    amt_str = p2_input_func("P2: Enter raise amount: ")
-                    raise_amt = int(amt_str)
-                except:
-                    if p2_message_func:
-                        p2_message_func("Invalid raise.")
-                    print("Invalid raise.")
-                    continue
-
-                if raise_amt <= 0 or raise_amt > p2_chips:
-                    if p2_message_func:
-                        p2_message_func("Invalid raise amount.")
-                    print("Invalid raise amount.")
-                    continue
-
-                p2_chips -= raise_amt
-                p2_contrib += raise_amt
-                pot += raise_amt
-                current_bet = p2_contrib
-                last_raiser = "p2"
-                print(f"P2 raises to {current_bet}.")
-                if p2_message_func:
-                    p2_message_func(f"You raise to {current_bet}.")
-                if p1_message_func:
-                    p1_message_func(f"Opponent raises to {current_bet}.")
-                if p2_chips == 0:
-                    print("P2 is all-in.")
-                    if p2_message_func:
-                        p2_message_func("You are all-in.")
-                    p2_all_in = True
-            else:
-                if p2_message_func:
-                    p2_message_func("Invalid action.")
-                print("Invalid action from P2.")
-                continue
-
-        if p1_contrib == p2_contrib and last_raiser is None:
-            break
+        for i in (0, 1):
+            if not state.in_hand[i] or all_in[i]:
+                continue  # nothing left for this seat to decide
+            if not await _player_turn(state, i):
+                break
+            if not state.in_hand[i]:
+                return state.pot, chips[0], chips[1], state.in_hand[0], state.in_hand[1]
+        else:
+            # Skipped when an action was invalid; the orbit then restarts from P1
+            if contrib[0] == contrib[1] and state.last_raiser is None:
+                break
 
-        if p1_contrib == p2_contrib and last_raiser is not None:
-            last_raiser = None
+            if contrib[0] == contrib[1] and state.last_raiser is not None:
+                state.last_raiser = None
 
-    return pot, p1_chips, p2_chips, p1_in, p2_in
+    return state.pot, chips[0], chips[1], state.in_hand[0], state.in_hand[1]
+
+async def play_full_game(sock, my_id, other_id):
+    p1 = LocalPlayer(sock)
+    p2 = RemotePlayer(sock, other_id)
 
-def play_full_game(sock, my_id, other_id):
     player1_chips = 1000 
     player2_chips = 1000 
     hand_number = 1
 
+    to = json_dumps(other_id)  # fills the "to" slot of the TPL_* lines
+    # The opponent is fixed for the game, so the lines repeated every hand are final now
+    rule_line = TPL_RULE % to
+    showdown_line = TPL_SHOWDOWN % to
+    tie_line = TPL_TIE % to
+
     print("\nWelcome to Texas Hold'em Poker (Heads-Up) - HOST/PLAYER 1!")
-    relay_send(sock, other_id, "MSG:Welcome to Texas Hold'em Poker (Heads-Up) - You are PLAYER 2.")
-    relay_send(sock, other_id, f"MSG:Small blind: {SMALL_BLIND} | Big blind: {BIG_BLIND}")
+    sock.write(TPL_WELCOME % to)
+    sock.write(TPL_BLINDS % to)
 
     while True:
         print("\n====================================")
@@ -378,10 +514,10 @@ def play_full_game(sock, my_id, other_id):
         print(f"Your chips (P1): {player1_chips} | Opponent chips (P2): {player2_chips}")
         print("====================================")
 
-        relay_send(sock, other_id, "MSG:====================================")
-        relay_send(sock, other_id, f"MSG:Hand #{hand_number}")
+        sock.write(rule_line)
+        sock.write(TPL_HAND % (to, hand_number))
         relay_send(sock, other_id, f"MSG:Your chips (P2): {player2_chips} | Opponent chips (P1): {player1_chips}")
-        relay_send(sock, other_id, "MSG:====================================")
+        sock.write(rule_line)
 
         if player1_chips <= 0:
             print("\nYou (P1) are out of chips. Player 2 wins the game.")
@@ -392,7 +528,7 @@ def play_full_game(sock, my_id, other_id):
             relay_send(sock, other_id, "MSG:You are out of chips. Opponent wins the game.")
             break
 
-        choice = input("Press ENTER to play a hand, or type Q to quit: ").lower()
+        choice = (await local_input("Press ENTER to play a hand, or type Q to quit: ", sock)).lower()
         if choice == "q":
             print("You quit the game.")
             relay_send(sock, other_id, "MSG:Host quit the game. Game over.")
@@ -403,9 +539,13 @@ def play_full_game(sock, my_id, other_id):
 
         p1_cards = deck.deal(2)
         p2_cards = deck.deal(2)
+        # Both hands are shown again on every street, so render them once per deal
+        p1_cards_str = cards_repr(p1_cards)
+        p2_cards_str = cards_repr(p2_cards)
+        p2_cards_line = json_dumps({"to": other_id, "payload": f"MSG:Your cards (P2): {p2_cards_str}"}) + b"\n"
 
-        print("\nYour cards (P1):", p1_cards)
-        relay_send(sock, other_id, f"MSG:Your cards (P2): {p2_cards}")
+        print("\nYour cards (P1):", p1_cards_str)
+        sock.write(p2_cards_line)
 
         sb = min(SMALL_BLIND, player1_chips)
         bb = min(BIG_BLIND, player2_chips)
@@ -426,19 +566,16 @@ def play_full_game(sock, my_id, other_id):
         relay_send(sock, other_id, f"MSG:You post big blind: {bb}")
         relay_send(sock, other_id, f"MSG:Pot after blinds: {pot}")
 
-        print("\nYour cards (P1):", p1_cards)
-        relay_send(sock, other_id, f"MSG:Your cards (P2): {p2_cards}")
+        print("\nYour cards (P1):", p1_cards_str)
+        sock.write(p2_cards_line)
 
-        pot, player1_chips, player2_chips, p1_in, p2_in = betting_round(
+        pot, player1_chips, player2_chips, p1_in, p2_in = await betting_round(
+            p1, p2,
             player1_chips, player2_chips, pot,
             "pre-flop",
             current_bet=current_bet,
             p1_contrib=p1_contrib,
             p2_contrib=p2_contrib,
-            p1_input_func=local_input,
-            p2_input_func=lambda prompt: remote_input(sock, other_id, prompt),
-            p1_message_func=lambda msg: print(msg),
-            p2_message_func=lambda msg: remote_message(sock, other_id, msg),
         )
 
         if not p1_in:
@@ -454,20 +591,18 @@ def play_full_game(sock, my_id, other_id):
             hand_number += 1
             continue
 
-        print("\nYour cards (P1):", p1_cards)
-        relay_send(sock, other_id, f"MSG:Your cards (P2): {p2_cards}")
+        print("\nYour cards (P1):", p1_cards_str)
+        sock.write(p2_cards_line)
 
         community = deck.deal(3)
-        print("\nFlop:", community)
-        relay_send(sock, other_id, f"MSG:Flop: {community}")
+        community_str = cards_repr(community)
+        print("\nFlop:", community_str)
+        relay_send(sock, other_id, f"MSG:Flop: {community_str}")
 
-        pot, player1_chips, player2_chips, p1_in, p2_in = betting_round(
+        pot, player1_chips, player2_chips, p1_in, p2_in = await betting_round(
+            p1, p2,
             player1_chips, player2_chips, pot,
             "flop",
-            p1_input_func=local_input,
-            p2_input_func=lambda prompt: remote_input(sock, other_id, prompt),
-            p1_message_func=lambda msg: print(msg),
-            p2_message_func=lambda msg: remote_message(sock, other_id, msg),
         )
         if not p1_in:
             player2_chips += pot
@@ -482,20 +617,18 @@ def play_full_game(sock, my_id, other_id):
             hand_number += 1
             continue
 
-        print("\nYour cards (P1):", p1_cards)
-        relay_send(sock, other_id, f"MSG:Your cards (P2): {p2_cards}")
+        print("\nYour cards (P1):", p1_cards_str)
+        sock.write(p2_cards_line)
 
         community += deck.deal(1)
-        print("\nTurn:", community)
-        relay_send(sock, other_id, f"MSG:Turn: {community}")
+        community_str = cards_repr(community)
+        print("\nTurn:", community_str)
+        relay_send(sock, other_id, f"MSG:Turn: {community_str}")
 
-        pot, player1_chips, player2_chips, p1_in, p2_in = betting_round(
+        pot, player1_chips, player2_chips, p1_in, p2_in = await betting_round(
+            p1, p2,
             player1_chips, player2_chips, pot,
             "turn",
-            p1_input_func=local_input,
-            p2_input_func=lambda prompt: remote_input(sock, other_id, prompt),
-            p1_message_func=lambda msg: print(msg),
-            p2_message_func=lambda msg: remote_message(sock, other_id, msg),
         )
         if not p1_in:
             player2_chips += pot
@@ -510,20 +643,18 @@ def play_full_game(sock, my_id, other_id):
             hand_number += 1
             continue
 
-        print("\nYour cards (P1):", p1_cards)
-        relay_send(sock, other_id, f"MSG:Your cards (P2): {p2_cards}")
+        print("\nYour cards (P1):", p1_cards_str)
+        sock.write(p2_cards_line)
 
         community += deck.deal(1)
-        print("\nRiver:", community)
-        relay_send(sock, other_id, f"MSG:River: {community}")
+        community_str = cards_repr(community)
+        print("\nRiver:", community_str)
+        relay_send(sock, other_id, f"MSG:River: {community_str}")
 
-        pot, player1_chips, player2_chips, p1_in, p2_in = betting_round(
+        pot, player1_chips, player2_chips, p1_in, p2_in = await betting_round(
+            p1, p2,
             player1_chips, player2_chips, pot,
             "river",
-            p1_input_func=local_input,
-            p2_input_func=lambda prompt: remote_input(sock, other_id, prompt),
-            p1_message_func=lambda msg: print(msg),
-            p2_message_func=lambda msg: remote_message(sock, other_id, msg),
         )
         if not p1_in:
             player2_chips += pot
@@ -539,64 +670,84 @@ def play_full_game(sock, my_id, other_id):
             continue
 
         print("\n--- SHOWDOWN ---")
-        print("Community cards:", community)
-        print("Your cards (P1):", p1_cards)
-        print("P2 cards:", p2_cards)
+        print("Community cards:", community_str)
+        print("Your cards (P1):", p1_cards_str)
+        print("P2 cards:", p2_cards_str)
 
-        relay_send(sock, other_id, "MSG:--- SHOWDOWN ---")
-        relay_send(sock, other_id, f"MSG:Community cards: {community}")
-        relay_send(sock, other_id, f"MSG:Your cards (P2): {p2_cards}")
-        relay_send(sock, other_id, f"MSG:Opponent cards (P1): {p1_cards}")
+        sock.write(showdown_line)
+        relay_send(sock, other_id, f"MSG:Community cards: {community_str}")
+        sock.write(p2_cards_line)
+        relay_send(sock, other_id, f"MSG:Opponent cards (P1): {p1_cards_str}")
 
         p1_best = best_five_of_seven(p1_cards + community)
         p2_best = best_five_of_seven(p2_cards + community)
 
-        print("\nYour hand (P1):", hand_description(p1_best))
-        print("P2 hand:", hand_description(p2_best))
+        p1_hand = hand_description(p1_best)
+        p2_hand = hand_description(p2_best)
 
-        relay_send(sock, other_id, f"MSG:Your hand: {hand_description(p2_best)}")
-        relay_send(sock, other_id, f"MSG:Opponent hand: {hand_description(p1_best)}")
+        print("\nYour hand (P1):", p1_hand)
+        print("P2 hand:", p2_hand)
 
-        if p1_best > p2_best:
+        relay_send(sock, other_id, f"MSG:Your hand: {p2_hand}")
+        relay_send(sock, other_id, f"MSG:Opponent hand: {p1_hand}")
+
+        if p1_best < p2_best:
             print(f"\nYou win the pot of {pot}!")
             relay_send(sock, other_id, f"MSG:Opponent wins the pot of {pot}.")
             player1_chips += pot
-        elif p2_best > p1_best:
+        elif p2_best < p1_best:
             print(f"\nPlayer 2 wins the pot of {pot}.")
             relay_send(sock, other_id, f"MSG:You win the pot of {pot}!")
             player2_chips += pot
         else:
             print("\nIt's a tie! Pot is split.")
-            relay_send(sock, other_id, "MSG:It's a tie! Pot is split.")
+            sock.write(tie_line)
             player1_chips += pot // 2
             player2_chips += pot // 2
 
         hand_number += 1
 
     print("\nThanks for playing!")
-    relay_send(sock, other_id, "MSG:Thanks for playing!")
-    relay_send(sock, other_id, "END:")
-
-def connect_to_relay(host="127.0.0.1", port=9000):
+    sock.write(TPL_THANKS % to)
+    sock.write(TPL_END % to)
+    await sock.flush()
+
+def tune_socket(conn):
+    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    conn.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+    conn.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+    if hasattr(socket, "TCP_QUICKACK"):  # Linux only
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+
+async def connect_to_relay(host="127.0.0.1", port=9000):
     print(f"Connecting to relay at {host}:{port} ...")
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.connect((host, port))
-        print("Connected to relay.")
-
-        welcome_raw = recv_line(s)
-        welcome = json.loads(welcome_raw)
+    reader, writer = await asyncio.open_connection(host, port)
+    tune_socket(writer.get_extra_info("socket"))
+    print("Connected to relay.")
+    conn = BufferedConn(reader, writer)
+    try:
+        welcome_raw = await conn.recv_line()
+        welcome = json_loads(welcome_raw)
         my_id = welcome["id"]
         print(f"My relay ID (HOST / P1): {my_id}")
 
-        other_id = input("Enter opponent's relay ID (P2): ").strip()
-
         try:
-            play_full_game(s, my_id, other_id)
+            other_id = (await local_input("Enter opponent's relay ID (P2): ", conn)).strip()
+            await play_full_game(conn, my_id, other_id)
         except ConnectionError as e:
             print(f"Connection lost: {e}")
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
 
+async def main():
+    relay_ip = (await local_input("Relay IP (default 127.0.0.1): ")).strip() or "127.0.0.1"
+    relay_port_str = (await local_input("Relay port (default 9000): ")).strip() or "9000"
+    relay_port = int(relay_port_str)
+    await connect_to_relay(relay_ip, relay_port)
 
-relay_ip = input("Relay IP (default 127.0.0.1): ").strip() or "127.0.0.1"
-relay_port_str = input("Relay port (default 9000): ").strip() or "9000"
-relay_port = int(relay_port_str)
-connect_to_relay(relay_ip, relay_port)
\ No newline at end of file
+asyncio.run(main())
@@ -1,80 +1,191 @@
 import asyncio
 import json
+import socket
 import uuid
+from functools import lru_cache
 
-clients = {}  # client_id -> writer
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj) -> bytes:
+        # Byte for byte what orjson writes: compact, with raw UTF-8 on the wire
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class ClientInfo:
+    __slots__ = ("writer", "queue", "queued", "dropped", "addr", "bytes_out")
+
+    def __init__(self, writer, addr):
+        self.writer = writer
+        self.queue = asyncio.Queue()  # outbound batches, drained by writer_loop
+        self.queued = 0  # bytes handed to the queue and not yet drained
+        self.dropped = False  # set once the client was aborted for not reading
+        self.addr = addr
+        self.bytes_out = 0  # bytes writer_loop got onto the socket
+
+clients = {}  # client_id -> ClientInfo
+list_line = None  # encoded LIST reply; reset whenever a client joins or leaves
+
+READ_SIZE = 65536
+HIGH_WATER = 4 << 20  # queued bytes before a client counts as not reading
+FLUSH_TIMEOUT = 10  # seconds a departing client gets to take what's still queued
+MAX_LINE = 65536  # same cap StreamReader.readline() enforced
+
+# Client IDs are uuid4 strings, so they drop into the JSON unescaped
+WELCOME_TEMPLATE = b'{"type":"welcome","id":"%s"}\n'
+
+@lru_cache(maxsize=1024)
+def from_prefix(client_id) -> bytes:
+    # The '{"from":...,"payload":' head of every line relayed from client_id
+    return b'{"from":' + json_dumps(client_id) + b',"payload":'
+
+def route_line(client_id, data, outgoing):
+    global list_line
+    # Parses one line from client_id and queues the lines it produces in
+    # outgoing (destination client_id -> list of encoded lines)
+    def queue(to_id, line):
+        outgoing.setdefault(to_id, []).append(line)
+
+    try:
+        msg = json_loads(data)
+    except json.JSONDecodeError:
+        print(f"[!] Invalid JSON from {client_id}: {data!r}")
+        return
+
+    target = msg.get("to")
+    payload = msg.get("payload")
+
+    if not target or payload is None:
+        print(f"[!] Malformed message from {client_id}: {msg}")
+        return
+
+    # Special target 'server' -> handle server commands
+    if target == "server":
+        # For now only support LIST
+        if isinstance(payload, str) and payload.upper() == "LIST":
+            if list_line is None:
+                list_line = json_dumps({"from": "server", "payload": "LIST:" + ",".join(clients)}) + b"\n"
+            queue(client_id, list_line)
+        else:
+            queue(client_id, json_dumps({"from": "server", "payload": "UNKNOWN_COMMAND"}) + b"\n")
+        return
+
+    if target not in clients:
+        print(f"[!] Target {target} not connected (from {client_id})")
+        # Inform sender
+        queue(client_id, json_dumps({"from": "server", "payload": f"ERROR:Target {target} not connected"}) + b"\n")
+        return
+
+    queue(target, from_prefix(client_id) + json_dumps(payload) + b"}\n")
+
+def send_to(client_id, data):
+    # Hands data to the client's writer task; never waits on the client itself
+    client = clients.get(client_id)
+    if client is None or client.dropped:
+        return  # disconnected while the batch was being routed
+    if client.queued + len(data) > HIGH_WATER:
+        print(f"[!] Client {client_id} is not reading, dropping it")
+        client.dropped = True
+        client.writer.transport.abort()  # its handler sees the connection end and cleans up
+        return
+    client.queue.put_nowait(data)
+    client.queued += len(data)
+
+async def writer_loop(client):
+    # The only place a client's socket is written and drained, so a slow
+    # reader backs up its own queue instead of stalling whoever sends to it
+    writer, queue = client.writer, client.queue
+    try:
+        while True:
+            data = await queue.get()
+            if data is None:
+                return
+            chunks = [data]
+            last = False
+            while not queue.empty():  # pick up whatever queued meanwhile
+                data = queue.get_nowait()
+                if data is None:
+                    last = True
+                    break
+                chunks.append(data)
+            batch = b"".join(chunks)
+            writer.write(batch)
+            await writer.drain()
+            client.queued -= len(batch)
+            client.bytes_out += len(batch)
+            if last:
+                return
+    except ConnectionError:
+        pass
 
 async def handle_client(reader, writer):
+    global list_line
     client_id = str(uuid.uuid4())
-    clients[client_id] = writer
-    addr = writer.get_extra_info("peername")
-    print(f"[+] Client connected: {client_id} from {addr}")
+    client = ClientInfo(writer, writer.get_extra_info("peername"))
+    clients[client_id] = client
+    list_line = None
+
+    sock = writer.get_extra_info("socket")
+    if sock is not None:
+        # Prompts and actions are tiny; ship them at once and let keepalive
+        # notice peers that vanished without closing the connection
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    print(f"[+] Client connected: {client_id} from {client.addr}")
 
     # Send welcome with assigned ID
-    welcome = {"type": "welcome", "id": client_id}
-    writer.write((json.dumps(welcome) + "\n").encode("utf-8"))
-    await writer.drain()
+    send_to(client_id, WELCOME_TEMPLATE % client_id.encode("ascii"))
+    writer_task = asyncio.create_task(writer_loop(client))
 
+    pending = b""
     try:
         while True:
-            data = await reader.readline()
-            if not data:
-                break
+            chunk = await reader.read(READ_SIZE)
+            if chunk:
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+            else:
+                lines = [pending] if pending else []
 
-            try:
-                msg = json.loads(data.decode("utf-8").strip())
-            except json.JSONDecodeError:
-                print(f"[!] Invalid JSON from {client_id}: {data!r}")
-                continue
-
-            target = msg.get("to")
-            payload = msg.get("payload")
-
-            if not target or payload is None:
-                print(f"[!] Malformed message from {client_id}: {msg}")
-                continue
-
-            # Special target 'server' -> handle server commands
-            if target == "server":
-                # For now only support LIST
-                if isinstance(payload, str) and payload.upper() == "LIST":
-                    ids = list(clients.keys())
-                    out = {"from": "server", "payload": "LIST:" + ",".join(ids)}
-                    writer.write((json.dumps(out) + "\n").encode("utf-8"))
-                    await writer.drain()
-                else:
-                    out = {"from": "server", "payload": "UNKNOWN_COMMAND"}
-                    writer.write((json.dumps(out) + "\n").encode("utf-8"))
-                    await writer.drain()
-                continue
-
-            if target not in clients:
-                print(f"[!] Target {target} not connected (from {client_id})")
-                # Inform sender
-                out = {"from": "server", "payload": f"ERROR:Target {target} not connected"}
-                writer.write((json.dumps(out) + "\n").encode("utf-8"))
-                await writer.drain()
-                continue
-
-            out = {
-                "from": client_id,
-                "payload": payload
-            }
-            out_writer = clients[target]
-            out_writer.write((json.dumps(out) + "\n").encode("utf-8"))
-            await out_writer.drain()
+            # Everything one read produced for a client is queued as one batch
+            outgoing = {}
+            for data in lines:
+                route_line(client_id, data, outgoing)
+            for to_id, out_lines in outgoing.items():
+                send_to(to_id, b"".join(out_lines))
+
+            if not chunk:
+                break
+            if len(pending) > MAX_LINE:
+                print(f"[!] Line too long from {client_id}, dropping connection")
+                break
 
     except Exception as e:
         print(f"[!] Error with client {client_id}: {e}")
 
     finally:
-        print(f"[-] Client disconnected: {client_id}")
         try:
             del clients[client_id]
         except KeyError:
             pass
+        list_line = None
+        client.queue.put_nowait(None)  # the writer task flushes what's queued, then stops
+        try:
+            await asyncio.wait_for(writer_task, FLUSH_TIMEOUT)
+        except asyncio.TimeoutError:
+            # Nothing can drop it through send_to any more, so a peer that
+            # stopped reading is cut off here instead
+            print(f"[!] Client {client_id} left {client.queued} bytes unread, aborting")
+            writer.transport.abort()
+        print(f"[-] Client disconnected: {client_id} from {client.addr} ({client.bytes_out} bytes relayed to it)")
         writer.close()
-        await writer.wait_closed()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
 
 async def main():
     host = "0.0.0.0"
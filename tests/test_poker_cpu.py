@@ -0,0 +1,71 @@
+import math
+import pathlib
+import sys
+import unittest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+import poker_cpu
+
+
+def branch_choices(strength, to_call, cpu_chips, raise_used):
+    # The CPU's action rules as betting_round spelled them out before CPU_POLICY
+    if to_call > 0:
+        if cpu_chips <= to_call:
+            return ("match",) if strength > 0.25 else ("match", "fold")
+        if raise_used:
+            if strength > 0.6:
+                return ("match",)
+            elif strength < 0.3:
+                return ("fold",)
+            return ("match", "fold")
+        if strength > 0.8:
+            return ("raise",)
+        elif strength > 0.5:
+            return ("match", "raise")
+        elif strength < 0.3:
+            return ("match", "fold")
+        return ("match",)
+    if cpu_chips == 0 or raise_used:
+        return ("check",)
+    if strength > 0.8:
+        return ("raise",)
+    elif strength > 0.5:
+        return ("check", "raise")
+    return ("check",)
+
+
+class CpuPolicyTest(unittest.TestCase):
+    def strengths(self):
+        # Each threshold, its float neighbours, and the k/200 and k/1000
+        # grids the equity estimates actually produce
+        for t in poker_cpu.STRENGTH_THRESHOLDS:
+            yield t
+            yield math.nextafter(t, 0.0)
+            yield math.nextafter(t, 1.0)
+        yield from (k / 200 for k in range(201))
+        yield from (k / 1000 for k in range(1001))
+
+    def test_policy_matches_branch_logic(self):
+        table = poker_cpu.CPU_POLICY
+        bucket = poker_cpu.strength_bucket
+        situations = [
+            (0, 0, False), (0, 0, True), (0, 50, False), (0, 50, True),
+            (10, 5, False), (10, 10, True), (10, 50, False), (10, 50, True),
+        ]
+        for strength in self.strengths():
+            for to_call, cpu_chips, raise_used in situations:
+                state = (to_call > 0) << 2 | raise_used << 1 | (cpu_chips > to_call)
+                with self.subTest(strength=strength, to_call=to_call, cpu_chips=cpu_chips, raise_used=raise_used):
+                    self.assertEqual(
+                        table[bucket(strength)][state],
+                        branch_choices(strength, to_call, cpu_chips, raise_used),
+                    )
+
+    def test_threshold_is_strict(self):
+        # Exactly 0.5, facing a bet with chips to raise: match only
+        self.assertEqual(poker_cpu.CPU_POLICY[poker_cpu.strength_bucket(0.5)][5], ("match",))
+
+
+if __name__ == "__main__":
+    unittest.main()